@@ -722,7 +722,7 @@ function sendGateway(payload: unknown): { ok: boolean; error?: string } {
   }
 }
 
-// ── Motor Controller (Python subprocess) ──────────────────────────────────
+// ── Motor Controller (Python hardware daemon: motors + audio) ─────────────
 
 let motorProcess: ChildProcess | null = null;
 let motorReady = false;
@@ -733,13 +733,22 @@ function startMotorController() {
     "..",
     "..",
     "scripts",
-    "motor_controller.py"
+    "hardware_daemon.py"
   );
 
   console.log("[Motors] Starting motor controller:", scriptPath);
 
+  // MOLTY_COMMAND_LOG=<path> records the command stream for command_storm.py replay
+  const commandLog = process.env.MOLTY_COMMAND_LOG;
+  const args = commandLog
+    ? [path.join(path.dirname(scriptPath), "command_storm.py"), "record", "--out", commandLog, "--", "python3", scriptPath]
+    : [scriptPath];
+  if (commandLog) {
+    console.log("[Motors] Recording commands to", commandLog);
+  }
+
   try {
-    motorProcess = spawn("python3", [scriptPath], {
+    motorProcess = spawn("python3", args, {
       stdio: ["pipe", "pipe", "pipe"],
     });
   } catch (err) {
@@ -771,6 +780,13 @@ function startMotorController() {
       if (!trimmed) continue;
       try {
         const status = JSON.parse(trimmed) as { type: string; status: string; message: string };
+        if (status.type !== "status") {
+          // Level meter / stats lines from the daemon
+          for (const w of BrowserWindow.getAllWindows()) {
+            w.webContents.send("hardware:event", status);
+          }
+          continue;
+        }
         console.log(`[Motors] Status: ${status.status} ${status.message}`);
         if (status.status === "ready") {
           motorReady = true;
@@ -11,6 +11,10 @@ type OpenClawMessagePayload = {
   ts: number
 }
 
+type HardwareEventPayload =
+  | { type: 'level'; t: number; rms: number; peak: number }
+  | { type: 'stats'; uptime: number; rss_kb: number; cpu_s: number; cpu_percent: number }
+
 function subscribe<T>(channel: string, handler: (payload: T) => void) {
   const listener = (_event: Electron.IpcRendererEvent, payload: T) => handler(payload)
   ipcRenderer.on(channel, listener)
@@ -73,4 +77,7 @@ contextBridge.exposeInMainWorld('motors', {
     ipcRenderer.invoke('motors:set-servos', angle1, angle2) as Promise<{ ok: boolean; error?: string }>,
   onStatus: (handler: (status: { type: string; status: string; message: string }) => void) =>
     subscribe<{ type: string; status: string; message: string }>('motors:status', handler),
+  // Level meter / stats lines from the hardware daemon
+  onHardwareEvent: (handler: (event: HardwareEventPayload) => void) =>
+    subscribe<HardwareEventPayload>('hardware:event', handler),
 })
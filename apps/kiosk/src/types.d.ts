@@ -14,6 +14,10 @@ declare global {
     ts: number
   }
 
+  type HardwareEventPayload =
+    | { type: 'level'; t: number; rms: number; peak: number }
+    | { type: 'stats'; uptime: number; rss_kb: number; cpu_s: number; cpu_percent: number }
+
   type FaceExpression =
     | 'idle'
     | 'listening'
@@ -62,6 +66,7 @@ declare global {
       stop: () => Promise<{ ok: boolean; error?: string }>
       setServos: (angle1: number, angle2: number) => Promise<{ ok: boolean; error?: string }>
       onStatus: (handler: (status: { type: string; status: string; message: string }) => void) => () => void
+      onHardwareEvent: (handler: (event: HardwareEventPayload) => void) => () => void
     }
   }
 }
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Play an audio clip while Molty's claws follow its loudness.
+
+The clip's amplitude envelope is computed up front with NumPy, downsampled to
+a servo frame rate and mapped to a claw-angle timeline. During playback the
+only per-frame work is a servo write at the scheduled time on the monotonic
+clock; frames that fall behind are skipped rather than queued.
+
+Run standalone, only the two servo pins are claimed (not the motor or standby
+pins), and they are released on exit. Inside hardware_daemon.py the claws are
+driven through the daemon's MotorController instead.
+
+Usage:
+  python claw_sync.py <audio_file>
+  python claw_sync.py <audio_file> --device 0 --frame-rate 20
+  python play_audio.py <audio_file> --claws
+
+Requirements:
+  pip install numpy sounddevice soundfile
+"""
+
+import argparse
+import sys
+import threading
+import time
+from typing import Callable
+
+try:
+    import numpy as np
+    import sounddevice as sd
+    import soundfile as sf
+except ImportError:
+    print("Missing dependencies. Install with: pip install numpy sounddevice soundfile", file=sys.stderr)
+    sys.exit(1)
+
+from play_audio import wait_for_playback
+
+DEFAULT_FRAME_RATE = 20.0
+CLAW_CLOSED_ANGLE = 30
+CLAW_OPEN_ANGLE = 150
+# Skip servo writes smaller than this to avoid buzzing on near-constant levels.
+ANGLE_DEADBAND = 3
+# Same pins as motor_controller.py: servo 1 (left claw), servo 2 (right claw).
+SERVO_PINS = (5, 21)
+
+
+class ClawServos:
+    """Servo-only PWM driver for standalone playback.
+
+    Claims just the claw pins, so it never touches the motor driver. Without
+    RPi.GPIO the claws are simulated; GPIO setup errors are raised, not hidden.
+    """
+
+    def __init__(self):
+        self._gpio = None
+        self._pwms = []
+        try:
+            import RPi.GPIO as GPIO
+        except ImportError:
+            print("RPi.GPIO unavailable - claws simulated", file=sys.stderr)
+            return
+        GPIO.setmode(GPIO.BCM)
+        for pin in SERVO_PINS:
+            GPIO.setup(pin, GPIO.OUT)
+            pwm = GPIO.PWM(pin, 50)
+            pwm.start(0)
+            self._pwms.append(pwm)
+        self._gpio = GPIO
+
+    def write(self, angle1: float, angle2: float):
+        """Set both claw duty cycles immediately (motor_controller's duty formula)."""
+        for pwm, angle in zip(self._pwms, (angle1, angle2)):
+            pwm.ChangeDutyCycle(2 + max(0, min(180, angle)) / 18)
+
+    def close(self):
+        """Stop PWM and release the servo pins."""
+        if self._gpio is None:
+            return
+        for pwm in self._pwms:
+            pwm.ChangeDutyCycle(0)
+            pwm.stop()
+        self._gpio.cleanup(list(SERVO_PINS))
+        self._gpio = None
+
+
+def compute_envelope(
+    data: np.ndarray,
+    sample_rate: int,
+    frame_rate: float = DEFAULT_FRAME_RATE,
+) -> np.ndarray:
+    """Return a 0-1 RMS envelope of the clip with one value per servo frame."""
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    hop = max(1, int(round(sample_rate / frame_rate)))
+    n_frames = -(-len(data) // hop)
+    padded = np.zeros(n_frames * hop, dtype=np.float32)
+    padded[:len(data)] = data
+    env = np.sqrt(np.square(padded.reshape(n_frames, hop)).mean(axis=1))
+    # Normalise against a high percentile so one loud plosive doesn't flatten the rest.
+    ref = np.percentile(env, 95) if n_frames else 0.0
+    if ref <= 0:
+        return np.zeros(n_frames, dtype=np.float32)
+    return np.clip(env / ref, 0.0, 1.0).astype(np.float32)
+
+
+def envelope_to_angles(
+    envelope: np.ndarray,
+    closed: float = CLAW_CLOSED_ANGLE,
+    open_: float = CLAW_OPEN_ANGLE,
+) -> np.ndarray:
+    """Map an envelope to integer claw angles: silence closed, loud open."""
+    return np.rint(closed + envelope * (open_ - closed)).astype(np.int16)
+
+
+def play_timeline(
+    angles: np.ndarray,
+    frame_rate: float,
+    start: float,
+    write_servos: Callable[[float, float], None],
+    clock=time.monotonic,
+    stop_event: threading.Event | None = None,
+) -> int:
+    """Write each angle to both claws at start + i / frame_rate on clock.
+
+    Frames whose slot has already passed are skipped, and setting stop_event
+    ends the timeline early. Returns the number of servo writes actually made.
+    """
+    period = 1.0 / frame_rate
+    last = None
+    writes = 0
+    for i, angle in enumerate(angles.tolist()):
+        due = start + i * period
+        now = clock()
+        if now >= due + period:
+            continue
+        if due > now:
+            if stop_event is not None:
+                if stop_event.wait(due - now):
+                    break
+            else:
+                time.sleep(due - now)
+        if last is None or abs(angle - last) >= ANGLE_DEADBAND:
+            write_servos(angle, angle)
+            last = angle
+            writes += 1
+    return writes
+
+
+def play_with_claws(
+    path: str,
+    write_servos: Callable[[float, float], None],
+    device: int | None = None,
+    frame_rate: float = DEFAULT_FRAME_RATE,
+    clock=time.monotonic,
+    stop_event: threading.Event | None = None,
+) -> None:
+    """Play an audio file with the claws driven by its envelope.
+
+    write_servos(angle1, angle2) must update the claws without blocking. The
+    claws are left closed; detaching PWM is up to the caller. Setting
+    stop_event ends playback early, even if it is set while decoding.
+    """
+    data, sample_rate = sf.read(path, dtype="float32")
+    angles = envelope_to_angles(compute_envelope(data, sample_rate, frame_rate))
+    if stop_event is not None and stop_event.is_set():
+        return
+
+    sd.play(data, sample_rate, device=device)
+    try:
+        # Align the timeline with when sound actually leaves the speaker.
+        start = clock() + sd.get_stream().latency
+        play_timeline(angles, frame_rate, start, write_servos, clock=clock, stop_event=stop_event)
+        if stop_event is None:
+            sd.wait()
+        else:
+            wait_for_playback(stop_event)
+    finally:
+        sd.stop()
+        write_servos(CLAW_CLOSED_ANGLE, CLAW_CLOSED_ANGLE)
+
+
+def play_standalone(
+    path: str,
+    device: int | None = None,
+    frame_rate: float = DEFAULT_FRAME_RATE,
+) -> None:
+    """Play with claws using a servo-only driver, releasing the pins afterwards."""
+    claws = ClawServos()
+    try:
+        play_with_claws(path, claws.write, device=device, frame_rate=frame_rate)
+    finally:
+        claws.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Play audio with claw motion synced to its loudness.")
+    parser.add_argument("audio_file", help="Path to audio file (WAV, FLAC, OGG, etc.)")
+    parser.add_argument(
+        "--device", "-d",
+        type=int,
+        default=None,
+        help="Output device index (default: system default speaker).",
+    )
+    parser.add_argument(
+        "--frame-rate", "-f",
+        type=float,
+        default=DEFAULT_FRAME_RATE,
+        metavar="HZ",
+        help=f"Claw updates per second (default: {DEFAULT_FRAME_RATE:g}).",
+    )
+    args = parser.parse_args()
+
+    try:
+        play_standalone(args.audio_file, device=args.device, frame_rate=args.frame_rate)
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Record and replay motor command streams to load-test motor_controller.py.
+
+record wraps the real controller (or hardware_daemon.py): stdin is forwarded
+to the child unchanged and every command line is logged with its arrival time.
+The kiosk does this automatically when MOLTY_COMMAND_LOG is set.
+
+replay feeds a log back into MotorController in simulation mode, at the
+recorded pace, N times faster, or as fast as possible, and reports blocked and
+dropped commands, orphaned animation threads, queue growth and latency
+percentiles. Servo moves are simulated with their real settle time
+(--servo-delay) so emotion changes contend the way they do on the Pi.
+hardware_daemon.py audio/stats commands in a log are skipped and counted.
+
+Usage:
+  python command_storm.py record --out storm.jsonl -- python3 motor_controller.py
+  python command_storm.py replay storm.jsonl
+  python command_storm.py replay storm.jsonl --speed 4
+  python command_storm.py replay storm.jsonl --speed max --json
+
+Log format (one JSON per line):
+  {"t": 1.2345, "line": "{\"command\": \"set_emotion\", \"emotion\": \"idle\"}"}
+  t is seconds since recording started; line is the raw command as received.
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import types
+
+CLOCK = time.monotonic
+DEFAULT_SERVO_DELAY = 0.5
+# hardware_daemon.py commands that never reach the MotorController.
+SKIPPED_COMMANDS = ("play", "record", "stop_audio", "stats")
+
+
+# ── Recording ────────────────────────────────────────────────────────────────
+
+def record(out_path: str, child_argv: list[str]) -> int:
+    """Forward stdin to child_argv while logging each command with a timestamp."""
+    proc = subprocess.Popen(child_argv, stdin=subprocess.PIPE, text=True, bufsize=1)
+
+    def handle_sigterm(signum, frame):
+        proc.terminate()
+        sys.exit(proc.wait())
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    start = CLOCK()
+    try:
+        with open(out_path, "w") as log:
+            for line in sys.stdin:
+                stripped = line.strip()
+                if stripped:
+                    entry = {"t": round(CLOCK() - start, 4), "line": stripped}
+                    log.write(json.dumps(entry) + "\n")
+                    log.flush()
+                try:
+                    proc.stdin.write(line)
+                    proc.stdin.flush()
+                except BrokenPipeError:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    return proc.wait()
+
+
+# ── Replay ───────────────────────────────────────────────────────────────────
+
+def load_log(path: str) -> list[tuple[float, str]]:
+    """Read a recorded command log as (t, raw_line) pairs sorted by time."""
+    events = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                events.append((float(entry["t"]), entry["line"]))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize_ms(values: list[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 2),
+        "p90": round(percentile(ordered, 90) * 1000, 2),
+        "p99": round(percentile(ordered, 99) * 1000, 2),
+        "max": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+    }
+
+
+def max_concurrent(lifetimes: list[list[float | None]]) -> int:
+    """Largest number of [start, end] spans open at once (end None = still running)."""
+    inf = float("inf")
+    edges = []
+    for start, end in lifetimes:
+        edges.append((start, 1))
+        edges.append((end if end is not None else inf, -1))
+    alive = most = 0
+    for _, step in sorted(edges):
+        alive += step
+        most = max(most, alive)
+    return most
+
+
+def replay(
+    events: list[tuple[float, str]],
+    speed: float | None,
+    servo_delay: float = DEFAULT_SERVO_DELAY,
+) -> dict:
+    """Replay events against a simulated MotorController and return a report.
+
+    speed=None replays as fast as possible; otherwise recorded gaps are divided
+    by speed. Latency is measured from a command's scheduled arrival to the end
+    of its dispatch, so it includes time spent queued behind slow commands.
+
+    Each motor command is classified by the statuses emitted while it is being
+    dispatched, on the dispatching thread only: "blocked" (dying in progress),
+    "errors" (invalid JSON, unknown command or emotion), or "dropped" -- accepted
+    but answered with no status at all, i.e. a stop swallowed while dying.
+    Statuses emitted asynchronously by animation threads are counted on their
+    own as animation_errors. Audio/stats commands are skipped, not dispatched.
+    Lines that are not JSON objects go through handle_command like in the real
+    controller, so they show up as errors.
+
+    A thread counts as orphaned if it was still running when set_emotion's or
+    stop's join(timeout=...) gave up on it; it keeps driving the motors after
+    the controller has moved on. Threads are also timed from start to exit to
+    find how many ran at once.
+    """
+    os.environ["MOLTY_SIMULATION"] = "1"
+    import motor_controller
+
+    dispatcher = threading.current_thread()
+    statuses: list[str] = []
+    animation_statuses: list[str] = []
+
+    def capture_status(status: str, message: str = ""):
+        if threading.current_thread() is dispatcher:
+            statuses.append(status)
+        else:
+            animation_statuses.append(status)
+
+    def simulated_set_servos(angle1: float, angle2: float):
+        # Two servos, each held for servo_delay, as set_servo_angle() does on hardware.
+        time.sleep(2 * servo_delay)
+
+    motor_controller.emit_status = capture_status
+    motor_controller.set_servos = simulated_set_servos
+
+    lifetimes: list[list[float | None]] = []  # [start, end] per animation thread
+    orphans: set[threading.Thread] = set()
+
+    class TrackedThread(threading.Thread):
+        """Animation thread that records its lifetime and any join that gave up."""
+
+        def run(self):
+            lifetime = [CLOCK(), None]
+            lifetimes.append(lifetime)
+            try:
+                super().run()
+            finally:
+                lifetime[1] = CLOCK()
+
+        def join(self, timeout=None):
+            started = CLOCK()
+            super().join(timeout)
+            # join() only returns before the timeout if the thread finished, so
+            # a full wait means it gave up, even if the thread exits microseconds later.
+            if self.is_alive() or (timeout is not None and CLOCK() - started >= timeout):
+                orphans.add(self)
+
+    # motor_controller only creates animation threads, so swap Thread in its namespace.
+    tracked_threading = types.SimpleNamespace(**vars(threading))
+    tracked_threading.Thread = TrackedThread
+    motor_controller.threading = tracked_threading
+
+    controller = motor_controller.MotorController()
+    pending: queue.Queue = queue.Queue()
+    depth_samples: list[int] = []
+
+    def feed():
+        start = CLOCK()
+        for t, line in events:
+            due = start + (t / speed if speed else 0.0)
+            delay = due - CLOCK()
+            if delay > 0:
+                time.sleep(delay)
+            pending.put((due, line))
+            depth_samples.append(pending.qsize())
+        pending.put(None)
+
+    counts = {"sent": 0, "skipped": 0, "blocked": 0, "dropped": 0, "errors": 0}
+    latencies: list[float] = []
+    service_times: list[float] = []
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    started = CLOCK()
+    feeder.start()
+
+    while True:
+        item = pending.get()
+        if item is None:
+            break
+        due, line = item
+        line_is_json = True
+        try:
+            cmd = json.loads(line)
+        except json.JSONDecodeError:
+            cmd = None
+            line_is_json = False
+        if isinstance(cmd, dict) and cmd.get("command") in SKIPPED_COMMANDS:
+            counts["skipped"] += 1
+            continue
+        counts["sent"] += 1
+        before = len(statuses)
+        t0 = CLOCK()
+        keep_going = True
+        if line_is_json:
+            keep_going = motor_controller.handle_command(controller, cmd)
+        else:
+            statuses.append("error")
+        done = CLOCK()
+        latencies.append(done - due)
+        service_times.append(done - t0)
+
+        emitted = statuses[before:]
+        if "blocked" in emitted:
+            counts["blocked"] += 1
+        elif "error" in emitted:
+            counts["errors"] += 1
+        elif not emitted:
+            counts["dropped"] += 1
+
+        if not keep_going:
+            break
+
+    elapsed = CLOCK() - started
+    controller.shutdown()
+    leaked = sum(1 for _, end in lifetimes if end is None)
+
+    return {
+        "commands": counts["sent"],
+        "skipped": counts["skipped"],
+        "speed": speed if speed else "max",
+        "elapsed_s": round(elapsed, 2),
+        "blocked": counts["blocked"],
+        "dropped": counts["dropped"],
+        "errors": counts["errors"],
+        "animation_errors": animation_statuses.count("error"),
+        "orphaned_threads": len(orphans),
+        "max_orphans_alive": max(0, max_concurrent(lifetimes) - 1),
+        "threads_alive_after_shutdown": leaked,
+        "max_queue_depth": max(depth_samples, default=0),
+        "latency_ms": summarize_ms(latencies),
+        "service_ms": summarize_ms(service_times),
+    }
+
+
+def print_report(path: str, report: dict) -> None:
+    speed = report["speed"]
+    pace = "max rate" if speed == "max" else f"{speed:g}x"
+    lat = report["latency_ms"]
+    svc = report["service_ms"]
+    print(f"Replayed {report['commands']} commands from {path} at {pace} in {report['elapsed_s']}s")
+    print(f"  skipped (audio/stats, not motor commands): {report['skipped']}")
+    print(f"  blocked: {report['blocked']}  dropped: {report['dropped']}  errors: {report['errors']}")
+    print("    (dropped = accepted with no status reply, e.g. stop while dying)")
+    print(f"  animation errors (async): {report['animation_errors']}")
+    print(
+        f"  orphaned animation threads: {report['orphaned_threads']} "
+        f"(max {report['max_orphans_alive']} alive at once, "
+        f"{report['threads_alive_after_shutdown']} alive after shutdown)"
+    )
+    print(f"  max queue depth: {report['max_queue_depth']}")
+    print(f"  latency ms: p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  max {lat['max']}")
+    print(f"  service ms: p50 {svc['p50']}  p90 {svc['p90']}  p99 {svc['p99']}  max {svc['max']}")
+
+
+def parse_speed(value: str) -> float | None:
+    if value == "max":
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record or replay motor command storms.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    rec = sub.add_parser("record", help="Log stdin commands while forwarding them to a child process.")
+    rec.add_argument("--out", "-o", required=True, help="Path of the command log to write.")
+    rec.add_argument("child", nargs=argparse.REMAINDER, help="Command to run, after --.")
+
+    rep = sub.add_parser("replay", help="Replay a command log against the simulated controller.")
+    rep.add_argument("log_file", help="Command log written by record.")
+    rep.add_argument(
+        "--speed", "-s",
+        type=parse_speed,
+        default=1.0,
+        help="Playback rate: 1 for real time, N for N times faster, or 'max' (default: 1).",
+    )
+    rep.add_argument(
+        "--servo-delay",
+        type=float,
+        default=DEFAULT_SERVO_DELAY,
+        metavar="SECONDS",
+        help=f"Simulated settle time per servo move (default: {DEFAULT_SERVO_DELAY}).",
+    )
+    rep.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        child = args.child[1:] if args.child[:1] == ["--"] else args.child
+        if not child:
+            parser.error("record needs a command to run, e.g. -- python3 motor_controller.py")
+        return record(args.out, child)
+
+    try:
+        report = replay(load_log(args.log_file), args.speed, args.servo_delay)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(args.log_file, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
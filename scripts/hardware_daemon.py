@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Hardware daemon for Molty — one long-lived process hosting the motor
+controller and the audio record/playback engines behind a single stdin/stdout
+JSON channel. GPIO and the Python imports are set up once, and motors and
+audio share the same monotonic clock. The audio stack (NumPy, PortAudio,
+libsndfile) is only loaded on the first play/record, and if it fails to load
+only audio commands are affected.
+
+Command protocol (stdin, one JSON per line):
+  Motor commands, as in motor_controller.py:
+  {"command": "set_emotion", "emotion": "excited"}
+  {"command": "set_servos", "angle1": 90, "angle2": 90}
+  {"command": "stop"}
+  {"command": "shutdown"}
+  Audio commands (run one at a time on the audio worker):
+  {"command": "play", "path": "reply.wav", "claws": true}   (claws pause animation servos)
+  {"command": "record", "path": "input.wav", "duration": 5, "levels": true}
+  {"command": "stop_audio"}
+  {"command": "stats"}
+
+Output (stdout, one JSON per line):
+  {"type": "status", "status": "...", "message": "..."}   (as motor_controller.py)
+  {"type": "level", "t": 1.2, "rms": 0.0213, "peak": 0.1874}   (record with levels)
+  {"type": "stats", "uptime": 12.3, "rss_kb": 23456, "cpu_s": 1.52, "cpu_percent": 3.1}
+
+Usage:
+  python hardware_daemon.py
+  python hardware_daemon.py --stats-interval 10
+"""
+
+import argparse
+import json
+import os
+import queue
+import resource
+import signal
+import sys
+import threading
+import time
+
+import motor_controller
+from motor_controller import MotorController, emit_status, handle_command
+
+# Single scheduler clock shared by motors and audio.
+CLOCK = time.monotonic
+
+AUDIO_COMMANDS = ("play", "record")
+
+
+# ── Resource Usage ───────────────────────────────────────────────────────────
+
+def read_rss_kb() -> int:
+    """Resident set size of this process in kB (peak RSS if /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ResourceMonitor:
+    """Tracks uptime, RSS and CPU use of the daemon between reports."""
+
+    def __init__(self):
+        self._start = CLOCK()
+        self._last_wall = self._start
+        self._last_cpu = self._cpu_seconds()
+        # The --stats-interval reporter and the stats command share the baseline.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        t = os.times()
+        return t.user + t.system
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = CLOCK()
+            cpu = self._cpu_seconds()
+            elapsed = now - self._last_wall
+            percent = 100.0 * (cpu - self._last_cpu) / elapsed if elapsed > 0 else 0.0
+            self._last_wall = now
+            self._last_cpu = cpu
+        return {
+            "type": "stats",
+            "uptime": round(now - self._start, 1),
+            "rss_kb": read_rss_kb(),
+            "cpu_s": round(cpu, 2),
+            "cpu_percent": round(percent, 1),
+        }
+
+    def emit(self):
+        try:
+            sys.stdout.write(json.dumps(self.snapshot()) + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            pass
+
+
+# ── Audio Engine ─────────────────────────────────────────────────────────────
+
+class AudioEngine:
+    """Runs play/record jobs one at a time on a worker thread.
+
+    Each job gets its own stop event when it is queued, so stop_audio cancels
+    it whether it is still queued or already running.
+    """
+
+    def __init__(self, controller: MotorController):
+        self._controller = controller
+        self._jobs: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._live_events: set[threading.Event] = set()
+        self._modules = None
+        self._load_error: str | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, cmd: dict):
+        """Queue a play or record command."""
+        if not cmd.get("path"):
+            emit_status("error", f"{cmd.get('command')} requires a path")
+            return
+        stop_event = threading.Event()
+        with self._lock:
+            self._live_events.add(stop_event)
+        self._jobs.put((cmd, stop_event))
+
+    def stop(self):
+        """Abort the current job and drop any queued ones."""
+        self._abort()
+        emit_status("audio_stopped", "audio stopped")
+
+    def shutdown(self):
+        self._abort()
+        self._jobs.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _abort(self):
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            for event in self._live_events:
+                event.set()
+            self._live_events.clear()
+        if self._modules is not None:
+            self._modules["sd"].stop()
+
+    def _load(self) -> bool:
+        """Import the audio stack on first use; a failure only disables audio."""
+        if self._modules is None and self._load_error is None:
+            try:
+                import numpy  # noqa: F401
+                import sounddevice as sd
+                import soundfile as sf
+                import claw_sync
+                import play_audio
+                import record_audio
+            except (ImportError, OSError) as e:
+                self._load_error = f"audio unavailable: {e}"
+            else:
+                self._modules = {
+                    "sd": sd,
+                    "sf": sf,
+                    "claw_sync": claw_sync,
+                    "play_audio": play_audio,
+                    "record_audio": record_audio,
+                }
+        return self._modules is not None
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            cmd, stop_event = job
+            try:
+                if stop_event.is_set():
+                    continue
+                if not self._load():
+                    emit_status("error", self._load_error)
+                elif stop_event.is_set():
+                    # stop_audio arrived while the audio stack was loading
+                    continue
+                elif cmd["command"] == "play":
+                    self._play(cmd, stop_event)
+                else:
+                    self._record(cmd, stop_event)
+            except Exception as e:
+                emit_status("error", f"{cmd['command']} failed: {e}")
+            finally:
+                with self._lock:
+                    self._live_events.discard(stop_event)
+
+    def _play(self, cmd: dict, stop_event: threading.Event):
+        path = cmd["path"]
+        emit_status("playing", path)
+        if cmd.get("claws"):
+            # The clip owns the claws; the running animation keeps the motors.
+            self._controller.hold_servos()
+            try:
+                self._modules["claw_sync"].play_with_claws(
+                    path,
+                    motor_controller.write_servos,
+                    device=cmd.get("device"),
+                    clock=CLOCK,
+                    stop_event=stop_event,
+                )
+            finally:
+                self._controller.release_servos()
+        else:
+            self._modules["play_audio"].play_file(
+                path,
+                device=cmd.get("device"),
+                stop_event=stop_event,
+            )
+        if not stop_event.is_set():
+            emit_status("played", path)
+
+    def _record(self, cmd: dict, stop_event: threading.Event):
+        record_audio = self._modules["record_audio"]
+        path = cmd["path"]
+        sample_rate = int(cmd.get("sample_rate", record_audio.DEFAULT_SAMPLE_RATE))
+        duration = float(cmd["duration"]) if cmd.get("duration") is not None else None
+        meter = None
+        if cmd.get("levels"):
+            level_rate = float(cmd.get("level_rate", record_audio.DEFAULT_LEVEL_RATE))
+            meter = record_audio.LevelMeter(sample_rate, level_rate)
+        emit_status("recording", path)
+        try:
+            data = record_audio.record_to_array(
+                device=cmd.get("device"),
+                sample_rate=sample_rate,
+                channels=int(cmd.get("channels", record_audio.DEFAULT_CHANNELS)),
+                duration=duration,
+                on_block=meter.update if meter else None,
+                stop_event=stop_event,
+            )
+        finally:
+            if meter:
+                meter.close()
+        self._modules["sf"].write(path, data, sample_rate, subtype="FLOAT")
+        emit_status("recorded", f"{path} ({len(data) / sample_rate:.2f}s)")
+
+
+# ── Main Loop ────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Molty hardware daemon (motors + audio).")
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Emit a stats line every SECONDS (default: only on the stats command).",
+    )
+    args = parser.parse_args()
+
+    controller = MotorController()
+    audio = AudioEngine(controller)
+    monitor = ResourceMonitor()
+    stop_reporting = threading.Event()
+    shut_down = False
+
+    def shutdown():
+        # Reached from the shutdown command, SIGTERM and the finally below.
+        nonlocal shut_down
+        if shut_down:
+            return
+        shut_down = True
+        stop_reporting.set()
+        audio.shutdown()
+        controller.shutdown()
+
+    def handle_sigterm(signum, frame):
+        shutdown()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    if args.stats_interval > 0:
+        def report():
+            while not stop_reporting.wait(args.stats_interval):
+                monitor.emit()
+        threading.Thread(target=report, daemon=True).start()
+
+    mode_msg = "GPIO unavailable - simulation mode" if motor_controller.SIMULATION_MODE else "GPIO active"
+    emit_status("ready", mode_msg)
+
+    try:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                cmd = json.loads(line)
+            except json.JSONDecodeError as e:
+                emit_status("error", f"invalid JSON: {e}")
+                continue
+
+            command = cmd.get("command") if isinstance(cmd, dict) else None
+
+            if command in AUDIO_COMMANDS:
+                audio.submit(cmd)
+            elif command == "stop_audio":
+                audio.stop()
+            elif command == "stats":
+                monitor.emit()
+            elif command == "shutdown":
+                break
+            else:
+                handle_command(controller, cmd)
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ Command protocol (stdin, one JSON per line):
   {"command": "shutdown"}
   {"command": "dying"}
 
+Set MOLTY_SIMULATION=1 to force simulation mode even when GPIO is available.
+
 Status output (stdout, one JSON per line):
   {"type": "status", "status": "ready", "message": "..."}
   {"type": "status", "status": "emotion_changed", "message": "..."}
@@ -27,6 +29,7 @@ Status output (stdout, one JSON per line):
 """
 
 import json
+import os
 import sys
 import threading
 import time
@@ -34,7 +37,7 @@ import signal
 
 # ── GPIO Setup (graceful degradation) ────────────────────────────────────────
 
-SIMULATION_MODE = False
+SIMULATION_MODE = os.environ.get("MOLTY_SIMULATION") == "1"
 
 try:
     from gpiozero import Motor, OutputDevice
@@ -78,6 +81,13 @@ if not SIMULATION_MODE and SERVO_AVAILABLE:
         SERVO_AVAILABLE = False
 
 
+# Servo ownership: while servos_held is set (claw playback in hardware_daemon.py),
+# animations keep driving the motors but their servo moves and detaches are
+# skipped (moves still take their settle time, keeping the choreography). _servo_lock covers one set_servos() move so a hold waits it out.
+_servo_lock = threading.Lock()
+servos_held = threading.Event()
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 def emit_status(status: str, message: str = ""):
@@ -122,22 +132,50 @@ def stop_motors():
     motor_b.stop()
 
 
+def angle_to_duty(angle: float) -> float:
+    """Tested duty-cycle formula for the SG90 servos (0-180 degrees)."""
+    return 2 + (angle / 18)
+
+
+SERVO_SETTLE_SECONDS = 0.5
+
+
 def set_servo_angle(pwm, angle: float):
     """Move a single servo to the given angle using tested duty-cycle formula."""
     if pwm is None:
         return
-    duty = 2 + (angle / 18)
-    pwm.ChangeDutyCycle(duty)
-    time.sleep(0.5)
+    pwm.ChangeDutyCycle(angle_to_duty(angle))
+    time.sleep(SERVO_SETTLE_SECONDS)
     pwm.ChangeDutyCycle(0)
 
 
 def set_servos(angle1: float, angle2: float):
-    """Set both servos to given angles (0-180)."""
+    """Set both servos to given angles (0-180).
+
+    While servos_held is set the PWM is left alone, but the call still takes
+    the usual settle time so animation timing doesn't change.
+    """
+    if SIMULATION_MODE or not SERVO_AVAILABLE:
+        return
+    with _servo_lock:
+        if not servos_held.is_set():
+            set_servo_angle(pwm_servo_1, max(0, min(180, angle1)))
+            set_servo_angle(pwm_servo_2, max(0, min(180, angle2)))
+            return
+    time.sleep(2 * SERVO_SETTLE_SECONDS)
+
+
+def write_servos(angle1: float, angle2: float):
+    """Update both servo duty cycles immediately, without settling or detaching.
+
+    For streamed motion where the caller paces updates itself (claw_sync.py).
+    Not gated by servos_held: use it between MotorController.hold_servos() and
+    release_servos().
+    """
     if SIMULATION_MODE or not SERVO_AVAILABLE:
         return
-    set_servo_angle(pwm_servo_1, max(0, min(180, angle1)))
-    set_servo_angle(pwm_servo_2, max(0, min(180, angle2)))
+    pwm_servo_1.ChangeDutyCycle(angle_to_duty(max(0, min(180, angle1))))
+    pwm_servo_2.ChangeDutyCycle(angle_to_duty(max(0, min(180, angle2))))
 
 
 def center_servos():
@@ -149,8 +187,11 @@ def detach_servos():
     """Stop sending PWM signal to prevent jitter."""
     if SIMULATION_MODE or not SERVO_AVAILABLE:
         return
-    pwm_servo_1.ChangeDutyCycle(0)
-    pwm_servo_2.ChangeDutyCycle(0)
+    with _servo_lock:
+        if servos_held.is_set():
+            return
+        pwm_servo_1.ChangeDutyCycle(0)
+        pwm_servo_2.ChangeDutyCycle(0)
 
 
 def interruptible_sleep(seconds: float, stop_event: threading.Event, step: float = 0.05):
@@ -431,6 +472,7 @@ class MotorController:
             self._thread = threading.Thread(
                 target=self._run_animation,
                 args=(anim_fn, emotion),
+                name=f"anim-{emotion}",
                 daemon=True,
             )
             self._thread.start()
@@ -448,6 +490,20 @@ class MotorController:
         set_servos(angle1, angle2)
         emit_status("servos_set", f"{angle1},{angle2}")
 
+    def hold_servos(self):
+        """Take the claws away from animations so another driver can own them.
+
+        Waits for an in-flight servo move to finish; motors keep animating.
+        """
+        with _servo_lock:
+            servos_held.set()
+
+    def release_servos(self):
+        """Hand the claws back to animations, detaching if none is running."""
+        servos_held.clear()
+        if not (self._thread and self._thread.is_alive()):
+            detach_servos()
+
     def stop(self):
         """Stop the current animation and motors."""
         with self._lock:
@@ -465,6 +521,7 @@ class MotorController:
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=2.0)
         stop_motors()
+        servos_held.clear()
         detach_servos()
         if not SIMULATION_MODE and SERVO_AVAILABLE:
             pwm_servo_1.stop()
@@ -477,6 +534,28 @@ class MotorController:
 
 # ── Main Loop ────────────────────────────────────────────────────────────────
 
+def handle_command(controller: MotorController, cmd: dict) -> bool:
+    """Dispatch one decoded command. Returns False once shutdown was requested."""
+    if not isinstance(cmd, dict):
+        emit_status("error", f"invalid command: expected a JSON object, got {type(cmd).__name__}")
+        return True
+    command = cmd.get("command")
+
+    if command == "set_emotion":
+        emotion = cmd.get("emotion", "")
+        controller.set_emotion(emotion)
+    elif command == "set_servos":
+        controller.set_servo_angles(cmd.get("angle1", 90), cmd.get("angle2", 90))
+    elif command == "stop":
+        controller.stop()
+    elif command == "shutdown":
+        controller.shutdown()
+        return False
+    else:
+        emit_status("error", f"unknown command: {command}")
+    return True
+
+
 def main():
     controller = MotorController()
 
@@ -502,20 +581,8 @@ def main():
                 emit_status("error", f"invalid JSON: {e}")
                 continue
 
-            command = cmd.get("command")
-
-            if command == "set_emotion":
-                emotion = cmd.get("emotion", "")
-                controller.set_emotion(emotion)
-            elif command == "set_servos":
-                controller.set_servo_angles(cmd.get("angle1", 90), cmd.get("angle2", 90))
-            elif command == "stop":
-                controller.stop()
-            elif command == "shutdown":
-                controller.shutdown()
+            if not handle_command(controller, cmd):
                 break
-            else:
-                emit_status("error", f"unknown command: {command}")
 
     except KeyboardInterrupt:
         pass
@@ -5,6 +5,7 @@ Play an audio file on the device's speaker (default output device or specified d
 Usage:
   python play_audio.py <audio_file>
   python play_audio.py <audio_file> --device 0
+  python play_audio.py <audio_file> --claws   # claws follow the audio (claw_sync.py)
   python play_audio.py --list-devices
 
 Requirements:
@@ -13,6 +14,7 @@ Requirements:
 
 import argparse
 import sys
+import threading
 
 try:
     import sounddevice as sd
@@ -28,15 +30,39 @@ def list_devices() -> None:
     print(sd.query_devices(kind="output"))
 
 
-def play_file(path: str, device: int | None = None) -> None:
-    """Play an audio file on the given device (default = system default speaker)."""
+def wait_for_playback(stop_event: threading.Event, poll: float = 0.05) -> bool:
+    """Wait for the current sd.play() to finish. Returns True if stop_event ended it."""
+    stream = sd.get_stream()
+    while stream.active:
+        if stop_event.wait(poll):
+            sd.stop()
+            return True
+    return stop_event.is_set()
+
+
+def play_file(
+    path: str,
+    device: int | None = None,
+    stop_event: threading.Event | None = None,
+) -> None:
+    """Play an audio file on the given device (default = system default speaker).
+
+    With a stop_event, playback is non-blocking underneath and setting the
+    event stops it, including while the file is still being decoded.
+    """
     data, sample_rate = sf.read(path, dtype="float32")
     if data.ndim == 1:
         channels = 1
     else:
         channels = data.shape[1]
 
-    sd.play(data, sample_rate, device=device, blocking=True)
+    if stop_event is None:
+        sd.play(data, sample_rate, device=device, blocking=True)
+        return
+    if stop_event.is_set():
+        return
+    sd.play(data, sample_rate, device=device)
+    wait_for_playback(stop_event)
 
 
 def main() -> int:
@@ -48,6 +74,11 @@ def main() -> int:
         default=None,
         help="Output device index (default: system default speaker). Use --list-devices to see indices.",
     )
+    parser.add_argument(
+        "--claws",
+        action="store_true",
+        help="Move Molty's claws in sync with the audio's loudness.",
+    )
     parser.add_argument(
         "--list-devices", "-l",
         action="store_true",
@@ -64,7 +95,11 @@ def main() -> int:
         return 1
 
     try:
-        play_file(args.audio_file, device=args.device)
+        if args.claws:
+            from claw_sync import play_standalone
+            play_standalone(args.audio_file, device=args.device)
+        else:
+            play_file(args.audio_file, device=args.device)
         return 0
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
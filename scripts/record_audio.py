@@ -6,24 +6,41 @@ Output can be played with play_audio.py.
 Usage:
   python record_audio.py [output.wav]
   python record_audio.py recording.wav --duration 10
+  python record_audio.py recording.wav --levels --level-rate 30
   python record_audio.py --list-devices
 
+Level output (stdout with --levels, one compact JSON per line):
+  {"type":"level","t":1.2,"rms":0.0213,"peak":0.1874}
+  t is seconds since the start of the recording; rms and peak are linear (0-1).
+  Other messages go to stderr so stdout carries only level lines.
+
+Library use:
+  from record_audio import record_to_array
+  samples = record_to_array(duration=3.0)  # float32 array, shape (frames, channels)
+
 Requirements:
-  pip install sounddevice soundfile
+  pip install numpy sounddevice soundfile
 """
 
 import argparse
+import json
+import queue
 import sys
+import threading
+from typing import Callable
 
 try:
+    import numpy as np
     import sounddevice as sd
     import soundfile as sf
 except ImportError:
-    print("Missing dependencies. Install with: pip install sounddevice soundfile", file=sys.stderr)
+    print("Missing dependencies. Install with: pip install numpy sounddevice soundfile", file=sys.stderr)
     sys.exit(1)
 
 DEFAULT_SAMPLE_RATE = 44100
 DEFAULT_CHANNELS = 1
+DEFAULT_BLOCKSIZE = 1024
+DEFAULT_LEVEL_RATE = 30.0
 
 
 def list_devices() -> None:
@@ -32,76 +49,182 @@ def list_devices() -> None:
     print(sd.query_devices(kind="input"))
 
 
-def record_to_file(
-    path: str,
+def emit_level(t: float, rms: float, peak: float) -> None:
+    """Write a level JSON line to stdout for the UI to parse."""
+    obj = {"type": "level", "t": round(t, 3), "rms": round(rms, 4), "peak": round(peak, 4)}
+    try:
+        sys.stdout.write(json.dumps(obj, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        pass
+
+
+class LevelMeter:
+    """Windowed RMS/peak meter fed from the capture callback.
+
+    update() only does NumPy reductions over the incoming block and queues the
+    finished windows; a writer thread does the JSON encoding and stdout I/O so a
+    slow reader can never stall the audio callback.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        rate: float = DEFAULT_LEVEL_RATE,
+        emit: Callable[[float, float, float], None] = emit_level,
+    ):
+        if rate <= 0:
+            raise ValueError("level rate must be positive")
+        self.sample_rate = sample_rate
+        self.window_frames = max(1, int(round(sample_rate / rate)))
+        self._emit = emit
+        self._sum_sq = 0.0
+        self._peak = 0.0
+        self._window_filled = 0
+        self._frames_seen = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def update(self, block: np.ndarray) -> None:
+        """Accumulate a (frames, channels) block, closing windows as they fill."""
+        start = 0
+        frames = len(block)
+        while start < frames:
+            n = min(frames - start, self.window_frames - self._window_filled)
+            part = block[start:start + n].ravel()
+            self._sum_sq += float(np.dot(part, part)) / (part.size // n)
+            self._peak = max(self._peak, float(part.max()), -float(part.min()))
+            self._window_filled += n
+            start += n
+            if self._window_filled == self.window_frames:
+                self._frames_seen += self._window_filled
+                rms = (self._sum_sq / self._window_filled) ** 0.5
+                self._queue.put((self._frames_seen / self.sample_rate, rms, self._peak))
+                self._sum_sq = 0.0
+                self._peak = 0.0
+                self._window_filled = 0
+
+    def close(self) -> None:
+        """Flush pending level lines and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join(timeout=1.0)
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._emit(*item)
+
+
+def record_to_array(
     *,
     device: int | None = None,
     sample_rate: int = DEFAULT_SAMPLE_RATE,
     channels: int = DEFAULT_CHANNELS,
     duration: float | None = None,
-) -> None:
-    """Record audio and save to a WAV file."""
-    print(f"Recording to {path} (sample_rate={sample_rate}, channels={channels})")
-    if duration is not None:
-        print(f"Duration: {duration}s (or press Ctrl+C to stop early)")
-    else:
-        print("Press Ctrl+C to stop recording")
+    blocksize: int = DEFAULT_BLOCKSIZE,
+    on_block: Callable[[np.ndarray], None] | None = None,
+    stop_event: threading.Event | None = None,
+) -> np.ndarray:
+    """Record audio into memory and return a (frames, channels) float32 array.
+
+    With a duration, the capture callback copies straight into a preallocated
+    array of exactly duration * sample_rate frames and stops the stream once it
+    is full. Without one, blocks are collected until Ctrl+C and joined at the end.
+    Stopping early with Ctrl+C returns whatever has been captured so far.
+
+    on_block, if given, is called from the audio callback with each captured
+    block (e.g. LevelMeter.update) and must not block. Setting stop_event ends
+    the recording from another thread, like Ctrl+C does.
+    """
+    if duration is not None and duration < 0:
+        raise ValueError(f"duration must be >= 0 seconds, got {duration}")
+    done = threading.Event()
+    total_frames = int(duration * sample_rate) if duration is not None else None
+    buffer = np.empty((total_frames or 0, channels), dtype="float32")
+    chunks: list[np.ndarray] = []
+    frames_written = 0
 
     def callback(indata, frames, time_info, status):
+        nonlocal frames_written
         if status:
             print(status, file=sys.stderr)
-        q.put(indata.copy())
+        if total_frames is None:
+            chunks.append(indata.copy())
+            frames_written += frames
+            if on_block is not None:
+                on_block(indata)
+            return
+        n = min(frames, total_frames - frames_written)
+        buffer[frames_written:frames_written + n] = indata[:n]
+        frames_written += n
+        if on_block is not None:
+            on_block(indata[:n])
+        if frames_written >= total_frames:
+            raise sd.CallbackStop
 
     try:
-        import queue
-        q = queue.Queue()
-
         with sd.InputStream(
             device=device,
             channels=channels,
             samplerate=sample_rate,
             dtype="float32",
-            blocksize=1024,
+            blocksize=blocksize,
             callback=callback,
+            finished_callback=done.set,
         ):
-            if duration is not None:
-                import time
-                total_frames = int(duration * sample_rate)
-                frames_written = 0
-                with sf.SoundFile(
-                    path,
-                    mode="w",
-                    samplerate=sample_rate,
-                    channels=channels,
-                    subtype="FLOAT",
-                ) as f:
-                    while frames_written < total_frames:
-                        remaining = total_frames - frames_written
-                        to_read = min(remaining, 1024)
-                        try:
-                            block = q.get(timeout=1.0)
-                        except Exception:
-                            break
-                        to_write = block[:to_read]
-                        f.write(to_write)
-                        frames_written += len(to_write)
-            else:
-                with sf.SoundFile(
-                    path,
-                    mode="w",
-                    samplerate=sample_rate,
-                    channels=channels,
-                    subtype="FLOAT",
-                ) as f:
-                    while True:
-                        try:
-                            f.write(q.get())
-                        except KeyboardInterrupt:
-                            break
+            # Poll so Ctrl+C is still delivered to the main thread.
+            while not done.wait(0.1):
+                if stop_event is not None and stop_event.is_set():
+                    break
     except KeyboardInterrupt:
         pass
 
-    print(f"Saved: {path}")
+    if total_frames is not None:
+        return buffer[:frames_written]
+    if not chunks:
+        return np.empty((0, channels), dtype="float32")
+    return np.concatenate(chunks)
+
+
+def record_to_file(
+    path: str,
+    *,
+    device: int | None = None,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    channels: int = DEFAULT_CHANNELS,
+    duration: float | None = None,
+    level_rate: float | None = None,
+) -> None:
+    """Record audio and save to a WAV file.
+
+    If level_rate is set, level JSON lines are emitted on stdout at that rate
+    while recording and progress messages move to stderr.
+    """
+    log = sys.stderr if level_rate is not None else sys.stdout
+    print(f"Recording to {path} (sample_rate={sample_rate}, channels={channels})", file=log)
+    if duration is not None:
+        print(f"Duration: {duration}s (or press Ctrl+C to stop early)", file=log)
+    else:
+        print("Press Ctrl+C to stop recording", file=log)
+
+    meter = LevelMeter(sample_rate, level_rate) if level_rate is not None else None
+    try:
+        data = record_to_array(
+            device=device,
+            sample_rate=sample_rate,
+            channels=channels,
+            duration=duration,
+            on_block=meter.update if meter else None,
+        )
+    finally:
+        if meter:
+            meter.close()
+    sf.write(path, data, sample_rate, subtype="FLOAT")
+
+    print(f"Saved: {path}", file=log)
 
 
 def main() -> int:
@@ -140,6 +263,18 @@ def main() -> int:
         choices=(1, 2),
         help=f"Number of channels (default: {DEFAULT_CHANNELS}).",
     )
+    parser.add_argument(
+        "--levels",
+        action="store_true",
+        help="Emit live RMS/peak level JSON lines on stdout while recording.",
+    )
+    parser.add_argument(
+        "--level-rate",
+        type=float,
+        default=DEFAULT_LEVEL_RATE,
+        metavar="HZ",
+        help=f"Level updates per second with --levels (default: {DEFAULT_LEVEL_RATE:g}).",
+    )
     parser.add_argument(
         "--list-devices", "-l",
         action="store_true",
@@ -161,6 +296,7 @@ def main() -> int:
             sample_rate=args.sample_rate,
             channels=args.channels,
             duration=args.duration,
+            level_rate=args.level_rate if args.levels else None,
         )
         return 0
     except Exception as e: